@@ -1,21 +1,32 @@
-import fileinput
-from typing import List
+from array import array
+import sys
+from typing import Iterable, List, Union
 import unittest
 
 
-def process(diffs: List[str]) -> int:
-    num_diffs = [(-1 if (x[0] == '-') else 1) * int(x[1:]) for x in diffs]
-    return sum(num_diffs)
+def load_diffs(diffs: Union[bytes, Iterable[str]]) -> array:
+    # int() takes the explicit sign, and accepts bytes, so a whole file parses in one call
+    if isinstance(diffs, bytes):
+        diffs = diffs.split()
+    return array('q', map(int, diffs))
+
+
+def process(diffs: Union[bytes, List[str]]) -> int:
+    return sum(load_diffs(diffs))
 
 
 if __name__ == '__main__':
-    lines = []
-    for line in fileinput.input():
-        lines += [line.strip()]
-    print(process(lines))
+    path = sys.argv[1] if len(sys.argv) > 1 else '-'
+    with (sys.stdin.buffer if path == '-' else open(path, 'rb')) as stream:
+        print(process(stream.read()))
 
 
 class Test011(unittest.TestCase):
+    def test_load_diffs(self):
+        self.assertEqual(
+            load_diffs(b'+1\n-2\n+3\n+1\n'),
+            array('q', [1, -2, 3, 1]))
+
     def test_1(self):
         self.assertEqual(
             process(['+1', '-2', '+3', '+1']),
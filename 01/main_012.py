@@ -1,11 +1,72 @@
-import fileinput
-from typing import List
+from array import array
+import bisect
+from collections import defaultdict
+import heapq
+import itertools
+import sys
+from typing import Any, Callable, Iterable, List, Union
 import unittest
 
 
-def process(diffs: List[str]) -> int:
-    num_diffs = [(-1 if (x[0] == '-') else 1) * int(x[1:]) for x in diffs]
-    seen_freqs = set([0])
+def load_diffs(diffs: Union[bytes, Iterable[str]]) -> array:
+    # int() takes the explicit sign, and accepts bytes, so a whole file parses in one call
+    if isinstance(diffs, bytes):
+        diffs = diffs.split()
+    return array('q', map(int, diffs))
+
+
+class BitmapSet(object):
+    def __init__(self, values: Iterable[int] = ()):
+        self.low = 0
+        self.bits = bytearray(1)
+        for value in values:
+            self.add(value)
+
+    def __contains__(self, value: int) -> bool:
+        idx = value - self.low
+        return 0 <= idx < len(self.bits) * 8 and bool(self.bits[idx >> 3] & (1 << (idx & 7)))
+
+    def add(self, value: int):
+        # grow at least geometrically on whichever side the value falls, so the bitmap only ever
+        # spans the observed min/max range plus slack
+        idx = value - self.low
+        if idx < 0:
+            grow = max((-idx + 7) // 8, len(self.bits))
+            self.bits[0:0] = bytes(grow)
+            self.low -= grow * 8
+            idx += grow * 8
+        elif idx >= len(self.bits) * 8:
+            self.bits.extend(bytes(max(idx // 8 + 1 - len(self.bits), len(self.bits))))
+        self.bits[idx >> 3] |= 1 << (idx & 7)
+
+
+class SortedArraySet(object):
+    def __init__(self, values: Iterable[int] = (), block_size: int = 4096):
+        self.values = array('q')
+        self.block = set()
+        self.block_size = block_size
+        for value in values:
+            self.add(value)
+
+    def __contains__(self, value: int) -> bool:
+        if value in self.block:
+            return True
+        idx = bisect.bisect_left(self.values, value)
+        return idx < len(self.values) and self.values[idx] == value
+
+    def add(self, value: int):
+        self.block.add(value)
+        # the block scales with the sorted array, so merges stay amortized linear overall
+        if len(self.block) >= max(self.block_size, len(self.values) // 16):
+            self.values = array('q', heapq.merge(self.values, sorted(self.block)))
+            self.block = set()
+
+
+SEEN_BACKENDS = {'set': set, 'bitmap': BitmapSet, 'sorted': SortedArraySet}
+
+
+def first_repeat_scan(num_diffs: List[int], seen: Callable[[Iterable[int]], Any] = set) -> int:
+    seen_freqs = seen([0])
     freq = 0
     idx = 0
     while True:
@@ -22,14 +83,60 @@ def process(diffs: List[str]) -> int:
     return freq
 
 
+def first_repeat(num_diffs: List[int]) -> int:
+    if not num_diffs:
+        return None
+
+    # pass k visits bases[i] + k * drift at step k * len(bases) + i
+    bases = [0] + list(itertools.accumulate(num_diffs))
+    drift = bases.pop()
+
+    seen_bases = set()
+    for base in bases:
+        if base in seen_bases:
+            return base
+        seen_bases.add(base)
+    if drift == 0:
+        return bases[0]
+
+    # a later pass can only land on a base from the same residue class, and the nearest one in the
+    # direction of the drift is hit first
+    classes = defaultdict(lambda: list())
+    for idx, base in enumerate(bases):
+        classes[base % abs(drift)].append((base, idx))
+
+    best = None
+    for members in classes.values():
+        members.sort(reverse=drift < 0)
+        for (start, idx), (target, _) in zip(members, members[1:]):
+            step = (target - start) // drift * len(bases) + idx
+            if best is None or step < best[0]:
+                best = (step, target)
+
+    return None if best is None else best[1]
+
+
+def process(diffs: Union[bytes, List[str]], method: str = 'analytic', seen: str = 'set') -> int:
+    num_diffs = load_diffs(diffs)
+    if method == 'analytic':
+        return first_repeat(num_diffs)
+    elif method == 'scan':
+        return first_repeat_scan(num_diffs, SEEN_BACKENDS[seen])
+    raise ValueError('Unknown method: {}'.format(method))
+
+
 if __name__ == '__main__':
-    lines = []
-    for line in fileinput.input():
-        lines += [line.strip()]
-    print(process(lines))
+    path = sys.argv[1] if len(sys.argv) > 1 else '-'
+    with (sys.stdin.buffer if path == '-' else open(path, 'rb')) as stream:
+        print(process(stream.read()))
 
 
 class Test012(unittest.TestCase):
+    def test_load_diffs(self):
+        self.assertEqual(
+            load_diffs(b'+1\n-2\n+3\n+1\n'),
+            array('q', [1, -2, 3, 1]))
+
     def test_1(self):
         self.assertEqual(
             process(['+1', '-2', '+3', '+1']),
@@ -54,3 +161,41 @@ class Test012(unittest.TestCase):
         self.assertEqual(
             process(['+7', '+7', '-2', '-7', '-4']),
             14)
+
+    def test_first_repeat__never(self):
+        self.assertEqual(
+            first_repeat([1, 1, 1]),
+            None)
+
+    def test_first_repeat__negative_drift(self):
+        self.assertEqual(
+            first_repeat([-7, -7, 2, 7, 4]),
+            -14)
+
+    def test_first_repeat__matches_scan(self):
+        for num_diffs in ([3, 3, 4, -2, -4], [-6, 3, 8, 5, -6], [5, -3, 1000, -1000]):
+            self.assertEqual(
+                first_repeat(num_diffs),
+                first_repeat_scan(num_diffs))
+
+    def test_bitmap_set(self):
+        seen = BitmapSet([0])
+        for value in (5, -20, 37, -3):
+            seen.add(value)
+        self.assertEqual(
+            [x for x in range(-25, 40) if x in seen],
+            [-20, -3, 0, 5, 37])
+
+    def test_sorted_array_set(self):
+        seen = SortedArraySet([0], block_size=2)
+        for value in (5, -20, 37, -3):
+            seen.add(value)
+        self.assertEqual(
+            [x for x in range(-25, 40) if x in seen],
+            [-20, -3, 0, 5, 37])
+
+    def test_process__scan_backends(self):
+        for seen in ('set', 'bitmap', 'sorted'):
+            self.assertEqual(
+                process(['+7', '+7', '-2', '-7', '-4'], method='scan', seen=seen),
+                14)
@@ -1,31 +1,122 @@
 from collections import Counter
-import fileinput
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import io
+import os
+import sys
+import tempfile
+from typing import Iterable, Iterator, List, Tuple, Union
 import unittest
 
+ONE_HOT = [bytes(int(x == unit) for x in range(256)) for unit in range(256)]
+IS_TWO = ONE_HOT[2]
+IS_THREE = ONE_HOT[3]
+
 
 def checksum_one(id: str) -> Tuple[bool, bool]:
     rev = {b: a for a, b in Counter(id).items()}
     return 2 in rev, 3 in rev
 
 
-def checksum(ids: List[str]) -> int:
+def count_ids(ids: Iterable[Union[str, bytes]]) -> Tuple[int, int]:
     count_two = 0
     count_three = 0
+    # one count slot per byte value, reset after each id instead of building a Counter
+    counts = [0] * 256
     for id in ids:
-        has_two, has_three = checksum_one(id)
-        if has_two:
+        if isinstance(id, str):
+            id = id.strip()
+            try:
+                units = id.encode('latin-1')
+            except UnicodeEncodeError:
+                units = None
+        else:
+            units = id.strip()
+            if not units.isascii():
+                # multi-byte characters must be counted as characters, not bytes
+                id = units.decode('utf-8', 'replace')
+                units = None
+        if units is None:
+            has_two, has_three = checksum_one(id)
+            count_two += has_two
+            count_three += has_three
+            continue
+        for unit in units:
+            counts[unit] += 1
+        if 2 in counts:
             count_two += 1
-        if has_three:
+        if 3 in counts:
             count_three += 1
+        for unit in units:
+            counts[unit] = 0
+    return count_two, count_three
+
+
+def checksum(ids: Iterable[Union[str, bytes]]) -> int:
+    count_two, count_three = count_ids(ids)
     return count_two * count_three
 
 
+def count_range(path: str, start: int, end: int) -> Tuple[int, int]:
+    # a range owns every line that starts inside it
+    with open(path, 'rb') as stream:
+        if start > 0:
+            stream.seek(start - 1)
+            start += len(stream.readline()) - 1
+
+        def lines() -> Iterator[bytes]:
+            pos = start
+            while pos < end:
+                line = stream.readline()
+                if not line:
+                    break
+                pos += len(line)
+                yield line
+
+        return count_ids(lines())
+
+
+def checksum_file(path: str, max_workers: int = None) -> int:
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    size = os.path.getsize(path)
+    step = max(-(-size // max_workers), 1)
+    starts = list(range(0, size, step))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        parts = list(executor.map(
+            count_range, [path] * len(starts), starts, [start + step for start in starts]))
+
+    return sum(x[0] for x in parts) * sum(x[1] for x in parts)
+
+
+def checksum_batch(ids: List[str]) -> int:
+    ids = [id.strip() for id in ids]
+    width = max(map(len, ids), default=0)
+    if width > 255:
+        return checksum(ids)
+
+    # one byte per cell, rows padded with NUL, which never occurs in an id; integers built from
+    # these bytes act as vectors with one byte lane per id, which cannot carry while counts stay
+    # below 256
+    try:
+        matrix = b''.join(id.encode('ascii').ljust(width, b'\0') for id in ids)
+    except UnicodeEncodeError:
+        return checksum(ids)
+    has_two = 0
+    has_three = 0
+    for unit in set(matrix) - {0}:
+        one_hot = matrix.translate(ONE_HOT[unit])
+        counts = sum(int.from_bytes(one_hot[col::width], 'little') for col in range(width))
+        counts = counts.to_bytes(len(ids), 'little')
+        has_two |= int.from_bytes(counts.translate(IS_TWO), 'little')
+        has_three |= int.from_bytes(counts.translate(IS_THREE), 'little')
+    return bin(has_two).count('1') * bin(has_three).count('1')
+
+
 if __name__ == '__main__':
-    lines = []
-    for line in fileinput.input():
-        lines += [line.strip()]
-    print(checksum(lines))
+    path = sys.argv[1] if len(sys.argv) > 1 else '-'
+    with (sys.stdin.buffer if path == '-' else open(path, 'rb')) as stream:
+        print(checksum(stream))
 
 
 class Test021(unittest.TestCase):
@@ -76,3 +167,66 @@ class Test021(unittest.TestCase):
                 'ababab'
             ]),
             12)
+
+    def test_stream(self):
+        self.assertEqual(
+            checksum(io.BytesIO(b'abcdef\nbababc\nabbcde\nabcccd\naabcdd\nabcdee\nababab\n')),
+            12)
+
+    def test_mixed_characters(self):
+        self.assertEqual(
+            checksum(['tZ', 'aaabb']),
+            1)
+        for ids in (['ab1', 'abA', 'a1a1'], ['AAzz', 'a b c', 'éé', '€€x']):
+            self.assertEqual(
+                count_ids(ids),
+                tuple(map(sum, zip(*map(checksum_one, ids)))))
+
+    def test_stream__utf8(self):
+        self.assertEqual(
+            count_ids([b'\xc3\xa9\xc3\xa0\n', 'éà'.encode('utf-8'), b'\xc3\xa9\xc3\xa9\n']),
+            (1, 0))
+
+    def test_stream__whitespace(self):
+        self.assertEqual(
+            count_ids([b'abc  \n', '  abc\t\t\r\n', b' aab \r\n']),
+            (1, 0))
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'ids.txt')
+            with open(path, 'wb') as f:
+                f.write(b'abcdef\nbababc\nabbcde\nabcccd\naabcdd\nabcdee\nababab\n')
+            for max_workers in (1, 3, 7):
+                self.assertEqual(checksum_file(path, max_workers), 12)
+
+    def test_batch(self):
+        self.assertEqual(
+            checksum_batch([
+                'abcdef',
+                'bababc',
+                'abbcde',
+                'abcccd',
+                'aabcdd',
+                'abcdee',
+                'ababab'
+            ]),
+            12)
+
+    def test_batch__ragged(self):
+        self.assertEqual(
+            checksum_batch(['aab', 'cccdd', 'x', 'yyy']),
+            checksum(['aab', 'cccdd', 'x', 'yyy']))
+
+    def test_batch__non_ascii(self):
+        self.assertEqual(
+            checksum_batch(['éé', 'ab', 'ccc']),
+            checksum(['éé', 'ab', 'ccc']))
+        self.assertEqual(
+            checksum_batch([' aab ', 'ccc\n']),
+            checksum([' aab ', 'ccc\n']))
+
+    def test_batch__spaces(self):
+        self.assertEqual(
+            checksum_batch(['a b', 'aa', 'x y z']),
+            checksum(['a b', 'aa', 'x y z']))
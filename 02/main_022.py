@@ -1,6 +1,7 @@
+from collections import defaultdict
 import fileinput
-import itertools
-from typing import List
+import operator
+from typing import Iterable, Iterator, List, Tuple
 import unittest
 
 
@@ -11,14 +12,85 @@ def munge_id(id: str) -> List[str]:
     return munged
 
 
+def hamming(id1: str, id2: str) -> int:
+    return sum(map(operator.ne, id1, id2))
+
+
+class IdIndex(object):
+    def __init__(self, max_mismatches: int = 1, ids: Iterable[str] = ()):
+        self.max_mismatches = max_mismatches
+        self.ids = set()
+        self.tables = defaultdict(lambda: set())
+        for id in ids:
+            self.insert(id)
+
+    def _keys(self, id: str) -> Iterator[Tuple[int, int, str]]:
+        # split into max_mismatches + 1 parts: an id within that many mismatches must match at
+        # least one part exactly
+        parts = self.max_mismatches + 1
+        for part in range(parts):
+            start = part * len(id) // parts
+            end = (part + 1) * len(id) // parts
+            yield len(id), part, id[start:end]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.ids
+
+    def insert(self, id: str):
+        if id in self.ids:
+            return
+        self.ids.add(id)
+        for key in self._keys(id):
+            self.tables[key].add(id)
+
+    def delete(self, id: str):
+        if id not in self.ids:
+            return
+        self.ids.remove(id)
+        for key in self._keys(id):
+            bucket = self.tables[key]
+            bucket.discard(id)
+            if not bucket:
+                del self.tables[key]
+
+    def lookup(self, id: str, max_mismatches: int = None) -> List[str]:
+        if max_mismatches is None:
+            max_mismatches = self.max_mismatches
+        if max_mismatches > self.max_mismatches:
+            raise ValueError('Index only supports up to {} mismatches'.format(self.max_mismatches))
+
+        candidates = set()
+        for key in self._keys(id):
+            candidates.update(self.tables.get(key, ()))
+        return sorted(x for x in candidates if hamming(x, id) <= max_mismatches)
+
+
+def iter_matches(ids: List[str]) -> Iterator[Tuple[str, str, str]]:
+    # ids differing in exactly position i share the key "id with position i removed"; duplicate
+    # ids would share every key, so drop them first
+    ids = list(dict.fromkeys(ids))
+    for i in range(max(map(len, ids), default=0)):
+        buckets = {}
+        for id in ids:
+            if len(id) <= i:
+                continue
+            key = id[:i] + id[i + 1:]
+            matched = buckets.setdefault(key, [])
+            for other in matched:
+                yield other, id, key
+            matched.append(id)
+
+
+def find_all(ids: List[str]) -> List[Tuple[str, str, str]]:
+    return list(iter_matches(ids))
+
+
 def find(ids: List[str]) -> str:
-    munged = {}
-    for id in ids:
-        munged[id] = munge_id(id)
-    for item1, item2 in itertools.combinations(munged.items(), 2):
-        for i in range(len(item1[1])):
-            if item1[1][i] == item2[1][i]:
-                return item1[1][i]
+    for _, _, common in iter_matches(ids):
+        return common
 
 
 if __name__ == '__main__':
@@ -46,3 +118,51 @@ class Test022(unittest.TestCase):
                 'wvxyz'
             ]),
             'fgij')
+
+    def test_find_all(self):
+        self.assertEqual(
+            find_all([
+                'abcde',
+                'fghij',
+                'abxde',
+                'fguij',
+                'abcdz'
+            ]),
+            [
+                ('abcde', 'abxde', 'abde'),
+                ('fghij', 'fguij', 'fgij'),
+                ('abcde', 'abcdz', 'abcd')
+            ])
+
+    def test_find__duplicates(self):
+        self.assertEqual(find(['abcde', 'abcde', 'zzzzz']), None)
+        self.assertEqual(find_all(['abc', 'abc']), [])
+        self.assertEqual(
+            find_all(['abcde', 'fghij', 'abcde', 'fguij']),
+            [('fghij', 'fguij', 'fgij')])
+
+    def test_hamming(self):
+        self.assertEqual(hamming('fghij', 'fguij'), 1)
+        self.assertEqual(hamming('abcde', 'axcye'), 2)
+
+    def test_id_index(self):
+        index = IdIndex(2, [
+            'abcde',
+            'fghij',
+            'klmno',
+            'pqrst',
+            'fguij',
+            'axcye',
+            'wvxyz'
+        ])
+        self.assertEqual(index.lookup('fghij', 1), ['fghij', 'fguij'])
+        self.assertEqual(index.lookup('abcde'), ['abcde', 'axcye'])
+        self.assertEqual(index.lookup('abcdx', 1), ['abcde'])
+
+        index.delete('fguij')
+        index.insert('fgxij')
+        self.assertEqual(len(index), 7)
+        self.assertEqual(index.lookup('fghij', 1), ['fghij', 'fgxij'])
+
+        with self.assertRaises(ValueError):
+            index.lookup('abcde', 3)
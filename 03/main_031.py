@@ -1,13 +1,17 @@
-from collections import defaultdict
+from array import array
 import fileinput
+import itertools
+import operator
 import re
-from typing import List, Type, TypeVar
+from typing import Iterator, List, Type, TypeVar
 import unittest
 
 T = TypeVar('T', bound='Claim')
 
 
 class Claim(object):
+    __slots__ = ('id', 'left', 'top', 'width', 'height')
+
     PARSER = re.compile(r'#([0-9]+) @ ([0-9]+),([0-9]+): ([0-9]+)x([0-9]+)')
 
     def __init__(self, id: int, left: int, top: int, width: int, height: int):
@@ -34,24 +38,139 @@ class Claim(object):
                 self.height == other.height)
 
 
+class CoverageTree(object):
+    def __init__(self, ys: List[int]):
+        self.ys = ys
+        size = 4 * max(len(ys) - 1, 1)
+        self.count = [0] * size
+        self.once = [0] * size
+        self.twice = [0] * size
+
+    def covered_twice(self) -> int:
+        return self.twice[1]
+
+    def add(self, lo: int, hi: int, delta: int):
+        self._add(1, 0, len(self.ys) - 1, lo, hi, delta)
+
+    def _add(self, node: int, node_lo: int, node_hi: int, lo: int, hi: int, delta: int):
+        if hi <= node_lo or node_hi <= lo:
+            return
+        if lo <= node_lo and node_hi <= hi:
+            self.count[node] += delta
+        else:
+            mid = (node_lo + node_hi) // 2
+            self._add(2 * node, node_lo, mid, lo, hi, delta)
+            self._add(2 * node + 1, mid, node_hi, lo, hi, delta)
+        self._pull(node, node_lo, node_hi)
+
+    def _pull(self, node: int, node_lo: int, node_hi: int):
+        # counts stay on the nodes that fully cover an update, so a node's covered lengths combine
+        # its own count with what its children report
+        full = self.ys[node_hi] - self.ys[node_lo]
+        leaf = node_hi - node_lo == 1
+        if self.count[node] >= 2:
+            self.once[node] = full
+            self.twice[node] = full
+        elif self.count[node] == 1:
+            self.once[node] = full
+            self.twice[node] = 0 if leaf else self.once[2 * node] + self.once[2 * node + 1]
+        else:
+            self.once[node] = 0 if leaf else self.once[2 * node] + self.once[2 * node + 1]
+            self.twice[node] = 0 if leaf else self.twice[2 * node] + self.twice[2 * node + 1]
+
+
+class Claims(object):
+    def __init__(self, ids: array, lefts: array, tops: array, widths: array, heights: array):
+        self.ids = ids
+        self.lefts = lefts
+        self.tops = tops
+        self.widths = widths
+        self.heights = heights
+
+    @classmethod
+    def from_text(cls, text: str) -> 'Claims':
+        # one regex pass over the whole file, then split the flat field stream into columns
+        fields = array('i', map(int, itertools.chain.from_iterable(Claim.PARSER.findall(text))))
+        return cls(fields[0::5], fields[1::5], fields[2::5], fields[3::5], fields[4::5])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, idx: int) -> Claim:
+        return Claim(self.ids[idx], self.lefts[idx], self.tops[idx], self.widths[idx],
+                     self.heights[idx])
+
+    def __iter__(self) -> Iterator[Claim]:
+        for fields in zip(self.ids, self.lefts, self.tops, self.widths, self.heights):
+            yield Claim(*fields)
+
+
 def parse(lines: List[str]) -> List[Claim]:
     return [Claim.from_line(x) for x in lines]
 
 
+def parse_bulk(text: str) -> Claims:
+    return Claims.from_text(text)
+
+
 def cover(claims: List[Claim]) -> int:
-    counts = defaultdict(lambda: 0)
+    if not claims:
+        return 0
+
+    min_x = min(claim.left for claim in claims)
+    min_y = min(claim.top for claim in claims)
+    width = max(claim.left + claim.width for claim in claims) - min_x
+    height = max(claim.top + claim.height for claim in claims) - min_y
+
+    # 2D difference array over the bounding box: each claim touches only its four corners
+    diff = [array('i', [0]) * (width + 1) for _ in range(height + 1)]
+    for claim in claims:
+        x0 = claim.left - min_x
+        y0 = claim.top - min_y
+        x1 = x0 + claim.width
+        y1 = y0 + claim.height
+        diff[y0][x0] += 1
+        diff[y0][x1] -= 1
+        diff[y1][x0] -= 1
+        diff[y1][x1] += 1
+
+    overlapped = 0
+    counts = [0] * (width + 1)
+    for row in diff[:height]:
+        counts = list(map(operator.add, counts, itertools.accumulate(row)))
+        overlapped += len(counts) - counts.count(0) - counts.count(1)
+    return overlapped
+
+
+def cover_sweep(claims: List[Claim]) -> int:
+    claims = [claim for claim in claims if claim.width > 0 and claim.height > 0]
+    if not claims:
+        return 0
+
+    ys = sorted(set(claim.top for claim in claims) |
+                set(claim.top + claim.height for claim in claims))
+    y_idx = dict((y, i) for i, y in enumerate(ys))
+
+    events = []
     for claim in claims:
-        for x in range(claim.left, claim.width + claim.left):
-            for y in range(claim.top, claim.height + claim.top):
-                counts[x, y] += 1
-    return len([x for x in counts.values() if x > 1])
+        lo = y_idx[claim.top]
+        hi = y_idx[claim.top + claim.height]
+        events.append((claim.left, 1, lo, hi))
+        events.append((claim.left + claim.width, -1, lo, hi))
+    events.sort()
+
+    tree = CoverageTree(ys)
+    area = 0
+    prev_x = events[0][0]
+    for x, delta, lo, hi in events:
+        area += tree.covered_twice() * (x - prev_x)
+        tree.add(lo, hi, delta)
+        prev_x = x
+    return area
 
 
 if __name__ == '__main__':
-    lines = []
-    for line in fileinput.input():
-        lines += [line.strip()]
-    print(cover(parse(lines)))
+    print(cover(parse_bulk(''.join(fileinput.input()))))
 
 
 class Test031(unittest.TestCase):
@@ -60,6 +179,13 @@ class Test031(unittest.TestCase):
             parse(['#123 @ 3,2: 5x4']),
             [Claim(123, 3, 2, 5, 4)])
 
+    def test_parse_bulk(self):
+        claims = parse_bulk('#123 @ 3,2: 5x4\n#7 @ 10,11: 1x2\n')
+        self.assertEqual(len(claims), 2)
+        self.assertEqual(claims[1], Claim(7, 10, 11, 1, 2))
+        self.assertEqual(list(claims), [Claim(123, 3, 2, 5, 4), Claim(7, 10, 11, 1, 2)])
+        self.assertEqual(claims.widths, array('i', [5, 1]))
+
     def test_cover(self):
         self.assertEqual(
             cover([
@@ -69,3 +195,41 @@ class Test031(unittest.TestCase):
             ]),
             4
         )
+
+    def test_cover__offset(self):
+        self.assertEqual(
+            cover([
+                Claim(1, 101, 203, 4, 4),
+                Claim(2, 103, 201, 4, 4),
+                Claim(3, 105, 205, 2, 2),
+                Claim(4, 101, 203, 1, 1)
+            ]),
+            5
+        )
+
+    def test_cover_sweep(self):
+        self.assertEqual(
+            cover_sweep([
+                Claim(1, 1, 3, 4, 4),
+                Claim(2, 3, 1, 4, 4),
+                Claim(3, 5, 5, 2, 2)
+            ]),
+            4
+        )
+
+    def test_cover_sweep__large(self):
+        self.assertEqual(
+            cover_sweep([
+                Claim(1, 0, 0, 3000000, 2000000),
+                Claim(2, 1000000, 1000000, 3000000, 3000000),
+                Claim(3, 1500000, 1500000, 1, 1),
+                Claim(4, 2999999, 0, 1, 1)
+            ]),
+            2000000 * 1000000 + 1
+        )
+
+    def test_cover__empty(self):
+        self.assertEqual(
+            cover([]),
+            0
+        )
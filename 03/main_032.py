@@ -1,13 +1,18 @@
+from array import array
 from collections import defaultdict
 import fileinput
+import itertools
+import operator
 import re
-from typing import List, Type, TypeVar
+from typing import Callable, Iterator, List, Tuple, Type, TypeVar
 import unittest
 
 T = TypeVar('T', bound='Claim')
 
 
 class Claim(object):
+    __slots__ = ('id', 'left', 'top', 'width', 'height')
+
     PARSER = re.compile(r'#([0-9]+) @ ([0-9]+),([0-9]+): ([0-9]+)x([0-9]+)')
 
     def __init__(self, id: int, left: int, top: int, width: int, height: int):
@@ -33,37 +38,193 @@ class Claim(object):
                 self.width == other.width and
                 self.height == other.height)
 
+    def overlaps(self, other: 'Claim') -> bool:
+        # claims without area cover no square inch, so they can never share one
+        return (self.width > 0 and self.height > 0 and
+                other.width > 0 and other.height > 0 and
+                self.left < other.left + other.width and
+                other.left < self.left + self.width and
+                self.top < other.top + other.height and
+                other.top < self.top + self.height)
+
+
+class RangeTree(object):
+    def __init__(self, size: int, op: Callable[[int, int], int]):
+        self.size = max(size, 1)
+        self.op = op
+        self.tag = [0] * (4 * self.size)
+        self.max = [0] * (4 * self.size)
+
+    def update(self, lo: int, hi: int, value: int):
+        self._update(1, 0, self.size, lo, hi, value)
+
+    def query(self, lo: int, hi: int) -> int:
+        return self._query(1, 0, self.size, lo, hi)
+
+    def _update(self, node: int, node_lo: int, node_hi: int, lo: int, hi: int, value: int):
+        if hi <= node_lo or node_hi <= lo:
+            return
+        if lo <= node_lo and node_hi <= hi:
+            # updates stay on the covering node instead of being pushed down to the children
+            self.tag[node] = self.op(self.tag[node], value)
+            self.max[node] = self.op(self.max[node], value)
+            return
+        mid = (node_lo + node_hi) // 2
+        self._update(2 * node, node_lo, mid, lo, hi, value)
+        self._update(2 * node + 1, mid, node_hi, lo, hi, value)
+        self.max[node] = self.op(self.tag[node], max(self.max[2 * node], self.max[2 * node + 1]))
+
+    def _query(self, node: int, node_lo: int, node_hi: int, lo: int, hi: int) -> float:
+        if hi <= node_lo or node_hi <= lo:
+            return float('-inf')
+        if lo <= node_lo and node_hi <= hi:
+            return self.max[node]
+        mid = (node_lo + node_hi) // 2
+        return self.op(self.tag[node], max(
+            self._query(2 * node, node_lo, mid, lo, hi),
+            self._query(2 * node + 1, mid, node_hi, lo, hi)))
+
+
+class ClaimIndex(object):
+    MAX_BUCKETS_PER_CLAIM = 16
+
+    def __init__(self, claims: List[Claim], bucket_size: int = None):
+        if bucket_size is None:
+            # the median claim size keeps a few huge claims from coarsening the grid for the rest
+            sizes = sorted(max(claim.width, claim.height) for claim in claims)
+            bucket_size = max(sizes[len(sizes) // 2] if sizes else 1, 1)
+
+        self.bucket_size = bucket_size
+        self.claims = {}
+        self.buckets = defaultdict(lambda: list())
+        # claims spanning too many buckets are kept aside and compared against every query directly
+        self.large = []
+        for claim in claims:
+            self.claims[claim.id] = claim
+            if self._is_large(claim):
+                self.large.append(claim.id)
+            else:
+                for key in self._bucket_keys(claim):
+                    self.buckets[key].append(claim.id)
+
+    def _bucket_ranges(self, claim: Claim) -> Tuple[range, range]:
+        size = self.bucket_size
+        return (range(claim.left // size, (claim.left + max(claim.width, 1) - 1) // size + 1),
+                range(claim.top // size, (claim.top + max(claim.height, 1) - 1) // size + 1))
+
+    def _is_large(self, claim: Claim) -> bool:
+        xs, ys = self._bucket_ranges(claim)
+        return len(xs) * len(ys) > self.MAX_BUCKETS_PER_CLAIM
+
+    def _bucket_keys(self, claim: Claim) -> Iterator[Tuple[int, int]]:
+        xs, ys = self._bucket_ranges(claim)
+        for bx in xs:
+            for by in ys:
+                yield bx, by
+
+    def _candidates(self, claim: Claim) -> Iterator[int]:
+        if self._is_large(claim):
+            return iter(self.claims)
+        buckets = (self.buckets.get(key, ()) for key in self._bucket_keys(claim))
+        return itertools.chain(self.large, itertools.chain.from_iterable(buckets))
+
+    def iter_intersecting(self, claim: Claim) -> Iterator[int]:
+        seen = set()
+        for id in self._candidates(claim):
+            if id != claim.id and id not in seen:
+                seen.add(id)
+                if claim.overlaps(self.claims[id]):
+                    yield id
+
+    def intersecting(self, id: int) -> List[int]:
+        return list(self.iter_intersecting(self.claims[id]))
+
+    def isolated(self) -> List[int]:
+        return [id for id, claim in self.claims.items()
+                if next(self.iter_intersecting(claim), None) is None]
+
+
+class Claims(object):
+    def __init__(self, ids: array, lefts: array, tops: array, widths: array, heights: array):
+        self.ids = ids
+        self.lefts = lefts
+        self.tops = tops
+        self.widths = widths
+        self.heights = heights
+
+    @classmethod
+    def from_text(cls, text: str) -> 'Claims':
+        # one regex pass over the whole file, then split the flat field stream into columns
+        fields = array('i', map(int, itertools.chain.from_iterable(Claim.PARSER.findall(text))))
+        return cls(fields[0::5], fields[1::5], fields[2::5], fields[3::5], fields[4::5])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, idx: int) -> Claim:
+        return Claim(self.ids[idx], self.lefts[idx], self.tops[idx], self.widths[idx],
+                     self.heights[idx])
+
+    def __iter__(self) -> Iterator[Claim]:
+        for fields in zip(self.ids, self.lefts, self.tops, self.widths, self.heights):
+            yield Claim(*fields)
+
 
 def parse(lines: List[str]) -> List[Claim]:
     return [Claim.from_line(x) for x in lines]
 
 
+def parse_bulk(text: str) -> Claims:
+    return Claims.from_text(text)
+
+
 def cover(claims: List[Claim]) -> int:
-    ids_per_square = defaultdict(lambda: list())
-    for claim in claims:
-        for x in range(claim.left, claim.width + claim.left):
-            for y in range(claim.top, claim.height + claim.top):
-                ids_per_square[x, y].append(claim.id)
-
-    counts_per_id = defaultdict(lambda: list())
-    for ids_per_square in ids_per_square.values():
-        curr_size = len(ids_per_square)
-        for id in ids_per_square:
-            counts_per_id[id].append(curr_size)
-
-    for id, ids in counts_per_id.items():
-        has_dupes = False
-        for c in ids:
-            has_dupes = has_dupes or c > 1
-        if not has_dupes:
-            return id
+    claims = [claim for claim in claims if claim.width > 0 and claim.height > 0]
+    for id in ClaimIndex(claims).isolated():
+        return id
+
+
+def cover_sweep(claims: List[Claim]) -> int:
+    claims = [claim for claim in claims if claim.width > 0 and claim.height > 0]
+
+    ys = sorted(set(claim.top for claim in claims) |
+                set(claim.top + claim.height for claim in claims))
+    y_idx = dict((y, i) for i, y in enumerate(ys))
+
+    # removals sort ahead of insertions at the same x, so claims that only touch never overlap
+    events = []
+    for i, claim in enumerate(claims):
+        events.append((claim.left, 1, i))
+        events.append((claim.left + claim.width, 0, i))
+    events.sort()
+
+    depth = RangeTree(len(ys) - 1, operator.add)
+    last_insert = RangeTree(len(ys) - 1, max)
+    inserted_at = {}
+    overlapping = set()
+    for order, (x, is_insert, i) in enumerate(events, 1):
+        lo = y_idx[claims[i].top]
+        hi = y_idx[claims[i].top + claims[i].height]
+        if is_insert:
+            # catches claims that were already active when this one started
+            depth.update(lo, hi, 1)
+            last_insert.update(lo, hi, order)
+            inserted_at[i] = order
+            if depth.query(lo, hi) > 1:
+                overlapping.add(i)
+        else:
+            # catches claims that started while this one was active
+            depth.update(lo, hi, -1)
+            if last_insert.query(lo, hi) > inserted_at[i]:
+                overlapping.add(i)
+
+    for i, claim in enumerate(claims):
+        if i not in overlapping:
+            return claim.id
 
 
 if __name__ == '__main__':
-    lines = []
-    for line in fileinput.input():
-        lines += [line.strip()]
-    print(cover(parse(lines)))
+    print(cover(parse_bulk(''.join(fileinput.input()))))
 
 
 class Test032(unittest.TestCase):
@@ -72,6 +233,13 @@ class Test032(unittest.TestCase):
             parse(['#123 @ 3,2: 5x4']),
             [Claim(123, 3, 2, 5, 4)])
 
+    def test_parse_bulk(self):
+        claims = parse_bulk('#123 @ 3,2: 5x4\n#7 @ 10,11: 1x2\n')
+        self.assertEqual(len(claims), 2)
+        self.assertEqual(claims[1], Claim(7, 10, 11, 1, 2))
+        self.assertEqual(list(claims), [Claim(123, 3, 2, 5, 4), Claim(7, 10, 11, 1, 2)])
+        self.assertEqual(claims.widths, array('i', [5, 1]))
+
     def test_cover(self):
         self.assertEqual(
             cover([
@@ -81,3 +249,72 @@ class Test032(unittest.TestCase):
             ]),
             3
         )
+
+    def test_claim_index_intersecting(self):
+        index = ClaimIndex([
+            Claim(1, 1, 3, 4, 4),
+            Claim(2, 3, 1, 4, 4),
+            Claim(3, 5, 5, 2, 2),
+            Claim(4, 6, 4, 3, 3)
+        ], bucket_size=2)
+        self.assertEqual(sorted(index.intersecting(1)), [2])
+        self.assertEqual(sorted(index.intersecting(4)), [2, 3])
+
+    def test_claim_index_isolated(self):
+        self.assertEqual(
+            ClaimIndex([
+                Claim(1, 1, 3, 4, 4),
+                Claim(2, 3, 1, 4, 4),
+                Claim(3, 5, 5, 2, 2),
+                Claim(4, 100, 100, 1, 1)
+            ]).isolated(),
+            [3, 4]
+        )
+
+    def test_claim_index__large_claim(self):
+        claims = [Claim(i, 3 * i, 0, 1, 1) for i in range(1, 1000)]
+        claims.append(Claim(1000, 1500, 0, 1000000, 1000000))
+        index = ClaimIndex(claims)
+        self.assertEqual(index.large, [1000])
+        self.assertEqual(len(index.buckets), 999)
+        self.assertEqual(index.intersecting(1000), list(range(500, 1000)))
+        self.assertEqual(index.intersecting(600), [1000])
+        self.assertEqual(index.isolated(), list(range(1, 500)))
+
+    def test_claim_index_isolated__zero_area(self):
+        self.assertEqual(
+            ClaimIndex([
+                Claim(1, 1, 7, 1, 1),
+                Claim(2, 6, 6, 1, 0),
+                Claim(3, 2, 5, 5, 4),
+                Claim(4, 8, 0, 5, 1)
+            ]).isolated(),
+            [1, 2, 3, 4]
+        )
+        self.assertEqual(
+            cover([
+                Claim(2, 6, 6, 1, 0),
+                Claim(3, 2, 5, 5, 4)
+            ]),
+            3
+        )
+
+    def test_cover_sweep(self):
+        self.assertEqual(
+            cover_sweep([
+                Claim(1, 1, 3, 4, 4),
+                Claim(2, 3, 1, 4, 4),
+                Claim(3, 5, 5, 2, 2)
+            ]),
+            3
+        )
+
+    def test_cover_sweep__touching(self):
+        self.assertEqual(
+            cover_sweep([
+                Claim(1, 0, 0, 2000000, 2000000),
+                Claim(2, 1000000, 1000000, 3000000, 3000000),
+                Claim(3, 2000000, 0, 5, 1000000)
+            ]),
+            3
+        )
@@ -5,7 +5,6 @@ import re
 from typing import List
 import unittest
 
-BASE_PARSER = re.compile(r'\[([^]]+)\] (.*)')
 GUARD_PARSER = re.compile(r'Guard #([0-9]+) begins shift')
 
 
@@ -81,9 +80,9 @@ class Window(object):
 
 
 def parse_line_raw(line: str) -> RawEvent:
-    timestamp_str, event_str = BASE_PARSER.findall(line)[0]
-    timestamp = datetime.datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M')
-    return RawEvent(timestamp, event_str)
+    timestamp = datetime.datetime(
+        int(line[1:5]), int(line[6:8]), int(line[9:11]), int(line[12:14]), int(line[15:17]))
+    return RawEvent(timestamp, line[19:].rstrip('\r\n'))
 
 
 def parse_line(raw_event: RawEvent, curr_guard_num: int) -> Event:
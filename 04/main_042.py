@@ -1,14 +1,30 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 import datetime
 import fileinput
+import functools
+import heapq
+import itertools
+import operator
+import os
 import re
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
 import unittest
 
-BASE_PARSER = re.compile(r'\[([^]]+)\] (.*)')
 GUARD_PARSER = re.compile(r'Guard #([0-9]+) begins shift')
 
+ON_DUTY = 0
+SLEEP = 1
+WAKE = 2
+KIND_CODES = {'G': ON_DUTY, 'f': SLEEP, 'w': WAKE}
+DIFF_ROW = array('i', [0]) * 61
+EPOCH = datetime.datetime(1970, 1, 1)
+ONE_MINUTE = datetime.timedelta(minutes=1)
+
 
 class RawEvent(object):
+    __slots__ = ('time', 'desc')
+
     def __init__(self, time: datetime.datetime, desc: str):
         self.time = time
         self.desc = desc
@@ -22,49 +38,83 @@ class RawEvent(object):
 
 
 class Event(object):
+    __slots__ = ('_guard_num', '_time_key')
+
+    KIND = None
+
     def __init__(self, time: datetime.datetime, guard_num: int):
+        # events are stored as whole minutes, so anything finer could not be given back
+        if time.second or time.microsecond:
+            raise ValueError('Event times must fall on a whole minute: {}'.format(time))
         self._guard_num = guard_num
-        self._time = time
+        self._time_key = (time - EPOCH) // ONE_MINUTE
+
+    @classmethod
+    def from_key(cls, time_key: int, guard_num: int) -> 'Event':
+        event = cls.__new__(cls)
+        event._guard_num = guard_num
+        event._time_key = time_key
+        return event
 
     def get_time(self):
-        return self._time
+        return EPOCH + self._time_key * ONE_MINUTE
+
+    def get_time_key(self):
+        return self._time_key
 
     def get_guard_num(self):
         return self._guard_num
 
     def __eq__(self, other):
-        return (self._time == other.get_time() and
+        return (self._time_key == other.get_time_key() and
                 self._guard_num == other.get_guard_num())
 
     def __repr__(self):
-        return 'Event({}, {})'.format(self._time, self._guard_num)
+        return 'Event({}, {})'.format(self.get_time(), self._guard_num)
 
 
 class OnDuty(Event):
+    __slots__ = ()
+
+    KIND = ON_DUTY
+
     def __init__(self, time: datetime.datetime, guard_num: int):
         super(OnDuty, self).__init__(time, guard_num)
 
     def __repr__(self):
-        return 'OnDuty({}, {})'.format(self._time, self._guard_num)
+        return 'OnDuty({}, {})'.format(self.get_time(), self._guard_num)
 
 
 class Sleep(Event):
+    __slots__ = ()
+
+    KIND = SLEEP
+
     def __init__(self, time: datetime.datetime, guard_num: int):
         super(Sleep, self).__init__(time, guard_num)
 
     def __repr__(self):
-        return 'Sleep({}, {})'.format(self._time, self._guard_num)
+        return 'Sleep({}, {})'.format(self.get_time(), self._guard_num)
 
 
 class Wake(Event):
+    __slots__ = ()
+
+    KIND = WAKE
+
     def __init__(self, time: datetime.datetime, guard_num: int):
         super(Wake, self).__init__(time, guard_num)
 
     def __repr__(self):
-        return 'Wake({}, {})'.format(self._time, self._guard_num)
+        return 'Wake({}, {})'.format(self.get_time(), self._guard_num)
+
+
+EVENT_TYPES = {ON_DUTY: OnDuty, SLEEP: Sleep, WAKE: Wake}
 
 
 class Window(object):
+    __slots__ = ('guard_num', 'start_min', 'end_min')
+
     def __init__(self, guard_num: int, start_min: int, end_min: int):
         self.guard_num = guard_num
         self.start_min = start_min
@@ -79,10 +129,82 @@ class Window(object):
         return 'Window({}, {}, {})'.format(self.guard_num, self.start_min, self.end_min)
 
 
+def days_from_civil(year: int, month: int, day: int) -> int:
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month - 3 if month > 2 else month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+class EventBatch(object):
+    def __init__(self):
+        self.times = array('q')
+        self.kinds = array('b')
+        self.guards = array('i')
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, idx: int) -> Event:
+        guard = self.guards[idx]
+        return EVENT_TYPES[self.kinds[idx]].from_key(self.times[idx], guard if guard >= 0 else None)
+
+    def __iter__(self) -> Iterator[Event]:
+        return map(self.__getitem__, range(len(self)))
+
+    def append_line(self, line: str):
+        self.times.append(time_key(line))
+        kind = KIND_CODES[line[19]]
+        self.kinds.append(kind)
+        self.guards.append(int(line[26:line.index(' ', 26)]) if kind == ON_DUTY else -1)
+
+    def sorted(self) -> 'EventBatch':
+        order = sort_order(self.times)
+        batch = EventBatch()
+        batch.times = array('q', map(self.times.__getitem__, order))
+        batch.kinds = array('b', map(self.kinds.__getitem__, order))
+        batch.guards = array('i', map(self.guards.__getitem__, order))
+        return batch
+
+    def attribute_guards(self) -> 'EventBatch':
+        # only valid once sorted: every event belongs to the most recent shift start
+        guard = -1
+        for idx, kind in enumerate(self.kinds):
+            if kind == ON_DUTY:
+                guard = self.guards[idx]
+            else:
+                self.guards[idx] = guard
+        return self
+
+
+def time_key(line: str) -> int:
+    # fixed layout: '[YYYY-MM-DD HH:MM] ' followed by the description
+    days = days_from_civil(int(line[1:5]), int(line[6:8]), int(line[9:11]))
+    return days * 1440 + int(line[12:14]) * 60 + int(line[15:17])
+
+
+def sort_order(keys: array) -> List[int]:
+    order = range(len(keys))
+    if all(map(operator.le, keys, itertools.islice(keys, 1, None))):
+        return list(order)
+    # Timsort merges the ordered runs that each log source delivers, so nearly sorted input stays
+    # close to linear
+    return sorted(order, key=keys.__getitem__)
+
+
 def parse_line_raw(line: str) -> RawEvent:
-    timestamp_str, event_str = BASE_PARSER.findall(line)[0]
-    timestamp = datetime.datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M')
-    return RawEvent(timestamp, event_str)
+    timestamp = datetime.datetime(
+        int(line[1:5]), int(line[6:8]), int(line[9:11]), int(line[12:14]), int(line[15:17]))
+    return RawEvent(timestamp, line[19:].rstrip('\r\n'))
+
+
+def parse_batch(lines: Iterable[str]) -> EventBatch:
+    batch = EventBatch()
+    for line in lines:
+        batch.append_line(line)
+    return batch
 
 
 def parse_line(raw_event: RawEvent, curr_guard_num: int) -> Event:
@@ -95,35 +217,76 @@ def parse_line(raw_event: RawEvent, curr_guard_num: int) -> Event:
 
 
 def parse(lines: List[str]) -> List[Event]:
-    raw_events = []
-    for line in lines:
-        raw_event = parse_line_raw(line)
-        raw_events.append(raw_event)
+    return list(parse_events(lines))
+
+
+def parse_events(lines: Iterable[str]) -> EventBatch:
+    return parse_batch(lines).sorted().attribute_guards()
+
+
+class ReorderBuffer(object):
+    def __init__(self, lateness: int):
+        self.lateness = lateness
+        self.heap = []
+        self.seq = 0
+        self.max_time = None
+        self.watermark = None
+        self.dropped = 0
+
+    def push(self, line: str) -> List[str]:
+        time = time_key(line)
+        if self.watermark is not None and time < self.watermark:
+            # everything before the watermark has been released already, so releasing this line
+            # now would put it out of order and hand it to the wrong guard
+            self.dropped += 1
+            return []
+
+        heapq.heappush(self.heap, (time, self.seq, line))
+        self.seq += 1
+        if self.max_time is None or time > self.max_time:
+            self.max_time = time
+        # no line still to come can be older than the watermark, so everything before it is final
+        self.watermark = self.max_time - self.lateness
+        return self._release(self.watermark)
+
+    def flush(self) -> List[str]:
+        return self._release(None)
+
+    def _release(self, watermark: int) -> List[str]:
+        released = []
+        while self.heap and (watermark is None or self.heap[0][0] < watermark):
+            released.append(heapq.heappop(self.heap)[2])
+        return released
+
+
+def parse_stream(lines: Iterable[str], lateness: int = 60) -> Iterator[Event]:
+    buffer = ReorderBuffer(lateness)
+    curr_guard_num = None
+    for line in itertools.chain(lines, [None]):
+        for ready in (buffer.flush() if line is None else buffer.push(line)):
+            event = parse_line(parse_line_raw(ready), curr_guard_num)
+            if isinstance(event, OnDuty):
+                curr_guard_num = event.get_guard_num()
+            yield event
 
-    raw_events = sorted(raw_events, key=lambda x: x.time)
 
-    curr_guard_num = None
-    events = []
-    for raw_event in raw_events:
-        event = parse_line(raw_event, curr_guard_num)
-        events.append(event)
-        if isinstance(event, OnDuty):
-            curr_guard_num = event.get_guard_num()
-    return events
+def build_windows(events: Union[EventBatch, List[Event]],
+                  guards: Dict[int, int] = None) -> List[Window]:
+    if guards is None:
+        guards = {}
 
+    if isinstance(events, EventBatch):
+        columns = zip(events.kinds, events.times, events.guards)
+    else:
+        columns = ((event.KIND, event.get_time_key(), event.get_guard_num()) for event in events)
 
-def build_windows(events: List[Event]) -> List[Window]:
-    guards = {}
+    # time keys count minutes from a midnight, so the minute of the hour is the key modulo 60
     windows = []
-    for event in events:
-        if isinstance(event, Sleep):
-            guards[event.get_guard_num()] = event.get_time().minute
-        elif isinstance(event, Wake):
-            windows.append(Window(
-                event.get_guard_num(),
-                guards[event.get_guard_num()],
-                event.get_time().minute))
-            del guards[event.get_guard_num()]
+    for kind, time, guard in columns:
+        if kind == SLEEP:
+            guards[guard] = time % 60
+        elif kind == WAKE:
+            windows.append(Window(guard, guards.pop(guard), time % 60))
     return windows
 
 
@@ -144,30 +307,177 @@ def find_sleepiest_minute(windows: List[Window], guard_num: int) -> (int, int):
     return freq_minute, times_slept
 
 
-def find_sleepiest_guard_minute(windows: List[Window]) -> (int, int):
-    guards = set([x.guard_num for x in windows])
-
-    sleepiest = dict((g, find_sleepiest_minute(windows, g)) for g in guards)
+class MinuteHistogram(object):
+    def __init__(self, windows: List[Window]):
+        self.guards = []
+        self.rows = {}
+
+        # one difference row of 61 slots per guard, so each window is two updates
+        diff = array('i')
+        for window in windows:
+            row = self.rows.get(window.guard_num)
+            if row is None:
+                row = self.rows[window.guard_num] = len(self.guards)
+                self.guards.append(window.guard_num)
+                diff.extend(DIFF_ROW)
+            diff[row * 61 + window.start_min] += 1
+            diff[row * 61 + window.end_min] -= 1
+
+        self.counts = array('i')
+        for row in range(len(self.guards)):
+            self.counts.extend(itertools.accumulate(diff[row * 61:row * 61 + 60]))
+
+    def merge(self, other: 'MinuteHistogram') -> 'MinuteHistogram':
+        for guard in other.guards:
+            row = self.rows.get(guard)
+            if row is None:
+                row = self.rows[guard] = len(self.guards)
+                self.guards.append(guard)
+                self.counts.extend(DIFF_ROW[:60])
+            self.counts[row * 60:(row + 1) * 60] = array(
+                'i', map(operator.add, self.counts[row * 60:(row + 1) * 60], other.minutes(guard)))
+        return self
+
+    def minutes(self, guard_num: int) -> array:
+        row = self.rows.get(guard_num)
+        if row is None:
+            return array('i', DIFF_ROW[:60])
+        return self.counts[row * 60:(row + 1) * 60]
+
+    def sleepiest_guard(self) -> int:
+        sleepiest = -1
+        most_sleep = -1
+        for guard in self.guards:
+            sleep_time = sum(self.minutes(guard))
+            if sleep_time > most_sleep:
+                most_sleep = sleep_time
+                sleepiest = guard
+        return sleepiest
+
+    def sleepiest_minute(self, guard_num: int) -> (int, int):
+        minutes = self.minutes(guard_num)
+        freq_minute = max(range(60), key=minutes.__getitem__)
+        return freq_minute, minutes[freq_minute]
+
+    def sleepiest_guard_minute(self) -> (int, int):
+        if not self.guards:
+            return -1, -1
+        idx = max(range(len(self.counts)), key=self.counts.__getitem__)
+        return self.guards[idx // 60], idx % 60
 
-    guard = -1
-    minute = -1
-    times_slept = -1
-    for g, (min, times) in sleepiest.items():
-        if times > times_slept:
-            times_slept = times
-            minute = min
-            guard = g
 
-    return guard, minute
+def find_sleepiest_guard_minute(windows: List[Window]) -> (int, int):
+    return MinuteHistogram(windows).sleepiest_guard_minute()
+
+
+class GuardSleepTracker(object):
+    def __init__(self, lateness: int = None):
+        self.buffer = None if lateness is None else ReorderBuffer(lateness)
+        self.curr_guard_num = None
+        self.sleeping = {}
+        self.minutes = {}
+        self.totals = {}
+        self.best_minutes = {}
+        self.sleepiest = (-1, -1)
+        self.sleepiest_pair = (-1, -1, -1)
+
+    def add_line(self, line: str):
+        self._add_ordered_lines([line] if self.buffer is None else self.buffer.push(line))
+
+    def flush(self):
+        if self.buffer is not None:
+            self._add_ordered_lines(self.buffer.flush())
+
+    def _add_ordered_lines(self, lines: List[str]):
+        for line in lines:
+            event = parse_line(parse_line_raw(line), self.curr_guard_num)
+            if isinstance(event, OnDuty):
+                self.curr_guard_num = event.get_guard_num()
+            self.add(event)
+
+    def add(self, event: Event):
+        # build_windows keeps the open sleep of each guard in self.sleeping between calls
+        for window in build_windows([event], self.sleeping):
+            self.add_window(window)
+
+    def add_window(self, window: Window):
+        # counts only ever grow, so every maximum can be maintained by comparing against the
+        # values that just changed
+        guard = window.guard_num
+        minutes = self.minutes.setdefault(guard, [0] * 60)
+        best_minute, best_count = self.best_minutes.get(guard, (-1, -1))
+        for minute in range(window.start_min, window.end_min):
+            minutes[minute] += 1
+            count = minutes[minute]
+            if count > best_count or (count == best_count and minute < best_minute):
+                best_minute, best_count = minute, count
+            if count > self.sleepiest_pair[2]:
+                self.sleepiest_pair = (guard, minute, count)
+        self.best_minutes[guard] = (best_minute, best_count)
+
+        total = self.totals.get(guard, 0) + window.end_min - window.start_min
+        self.totals[guard] = total
+        if total > self.sleepiest[1]:
+            self.sleepiest = (guard, total)
+
+    def sleepiest_guard(self) -> int:
+        return self.sleepiest[0]
+
+    def sleepiest_minute(self, guard_num: int) -> (int, int):
+        return self.best_minutes.get(guard_num, (0, 0))
+
+    def sleepiest_guard_minute(self) -> (int, int):
+        return self.sleepiest_pair[:2]
 
 
 def process(lines: List[str]) -> int:
-    events = parse(lines)
-    windows = build_windows(events)
+    windows = build_windows(parse_events(lines))
     sleepiest_minute, sleepiest_guard = find_sleepiest_guard_minute(windows)
     return sleepiest_guard * sleepiest_minute
 
 
+def histogram_shard(kinds: array, times: array, guards: array) -> MinuteHistogram:
+    batch = EventBatch()
+    batch.kinds = kinds
+    batch.times = times
+    batch.guards = guards
+    return MinuteHistogram(build_windows(batch))
+
+
+def shard_bounds(kinds: array, shards: int) -> List[Tuple[int, int]]:
+    # every shard starts on a shift change, so each one knows which guard its events belong to
+    target = max(-(-len(kinds) // max(shards, 1)), 1)
+    bounds = []
+    start = 0
+    for idx, kind in enumerate(kinds):
+        if kind == ON_DUTY and idx - start >= target:
+            bounds.append((start, idx))
+            start = idx
+    bounds.append((start, len(kinds)))
+    return bounds
+
+
+def process_parallel(lines: Iterable[str], max_workers: int = None, shards: int = None) -> int:
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if shards is None:
+        shards = max_workers * 4
+
+    batch = parse_events(lines)
+    bounds = shard_bounds(batch.kinds, shards)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        parts = executor.map(
+            histogram_shard,
+            [batch.kinds[start:end] for start, end in bounds],
+            [batch.times[start:end] for start, end in bounds],
+            [batch.guards[start:end] for start, end in bounds])
+        histogram = functools.reduce(MinuteHistogram.merge, parts, MinuteHistogram([]))
+
+    sleepiest_guard, sleepiest_minute = histogram.sleepiest_guard_minute()
+    return sleepiest_guard * sleepiest_minute
+
+
 if __name__ == '__main__':
     lines = []
     for line in fileinput.input():
@@ -183,6 +493,57 @@ class Test042(unittest.TestCase):
             RawEvent(datetime.datetime(1518, 11, 1, 0, 0), 'Guard #10 begins shift')
         )
 
+    def test_days_from_civil(self):
+        self.assertEqual(days_from_civil(1970, 1, 1), 0)
+        self.assertEqual(
+            days_from_civil(1518, 11, 1),
+            (datetime.date(1518, 11, 1) - datetime.date(1970, 1, 1)).days)
+
+    def test_parse_batch(self):
+        batch = parse_batch([
+            '[1518-11-01 00:00] Guard #10 begins shift',
+            '[1518-11-01 00:05] falls asleep',
+            '[1518-11-01 00:25] wakes up'
+        ])
+        midnight = days_from_civil(1518, 11, 1) * 1440
+        self.assertEqual(batch.times, array('q', [midnight, midnight + 5, midnight + 25]))
+        self.assertEqual(batch.kinds, array('b', [ON_DUTY, SLEEP, WAKE]))
+        self.assertEqual(batch.guards, array('i', [10, -1, -1]))
+
+    def test_sort_order(self):
+        self.assertEqual(sort_order(array('q', [1, 2, 2, 5])), [0, 1, 2, 3])
+        self.assertEqual(sort_order(array('q', [3, 1, 2, 1])), [1, 3, 2, 0])
+
+    def test_event_batch_sorted(self):
+        batch = parse_batch([
+            '[1518-11-01 00:25] wakes up',
+            '[1518-11-01 00:00] Guard #10 begins shift',
+            '[1518-11-01 00:05] falls asleep'
+        ]).sorted()
+        self.assertEqual(batch.kinds, array('b', [ON_DUTY, SLEEP, WAKE]))
+        self.assertEqual(batch.guards, array('i', [10, -1, -1]))
+
+    def test_event_batch_views(self):
+        batch = parse_events([
+            '[1518-11-01 00:05] falls asleep',
+            '[1518-11-01 00:00] Guard #10 begins shift'
+        ])
+        self.assertEqual(batch.guards, array('i', [10, 10]))
+        self.assertEqual(
+            list(batch),
+            [
+                OnDuty(datetime.datetime(1518, 11, 1, 0, 0), 10),
+                Sleep(datetime.datetime(1518, 11, 1, 0, 5), 10)
+            ]
+        )
+        self.assertEqual(batch[1].get_time(), datetime.datetime(1518, 11, 1, 0, 5))
+
+    def test_event__sub_minute(self):
+        with self.assertRaises(ValueError):
+            Sleep(datetime.datetime(1518, 11, 1, 0, 5, 30), 10)
+        with self.assertRaises(ValueError):
+            Wake(datetime.datetime(1518, 11, 1, 0, 5, 0, 1), 10)
+
     def test_parse_line__guard_init(self):
         self.assertEqual(
             parse_line(
@@ -267,6 +628,22 @@ class Test042(unittest.TestCase):
             ]
         )
 
+    def test_build_windows__batch(self):
+        self.assertEqual(
+            build_windows(parse_events([
+                '[1518-11-01 00:00] Guard #10 begins shift',
+                '[1518-11-01 00:05] falls asleep',
+                '[1518-11-01 00:25] wakes up',
+                '[1518-11-01 23:58] Guard #99 begins shift',
+                '[1518-11-02 00:40] falls asleep',
+                '[1518-11-02 00:50] wakes up'
+            ])),
+            [
+                Window(10, 5, 25),
+                Window(99, 40, 50)
+            ]
+        )
+
     def test_find_sleepiest_minute(self):
         self.assertEqual(
             find_sleepiest_minute(
@@ -296,6 +673,106 @@ class Test042(unittest.TestCase):
             (99, 45)
         )
 
+    def test_minute_histogram(self):
+        histogram = MinuteHistogram([
+            Window(10, 5, 25),
+            Window(10, 30, 55),
+            Window(99, 40, 50),
+            Window(10, 24, 29),
+            Window(99, 36, 46),
+            Window(99, 45, 55)
+        ])
+        self.assertEqual(histogram.sleepiest_guard(), 10)
+        self.assertEqual(histogram.sleepiest_minute(10), (24, 2))
+        self.assertEqual(histogram.sleepiest_minute(99), (45, 3))
+        self.assertEqual(histogram.sleepiest_minute(7), (0, 0))
+        self.assertEqual(histogram.sleepiest_guard_minute(), (99, 45))
+
+    def test_guard_sleep_tracker(self):
+        tracker = GuardSleepTracker()
+        tracker.add_line('[1518-11-01 00:00] Guard #10 begins shift')
+        tracker.add_line('[1518-11-01 00:05] falls asleep')
+        self.assertEqual(tracker.sleepiest_guard(), -1)
+        tracker.add_line('[1518-11-01 00:25] wakes up')
+        self.assertEqual(tracker.sleepiest_guard(), 10)
+        self.assertEqual(tracker.sleepiest_minute(10), (5, 1))
+        tracker.add_line('[1518-11-01 23:58] Guard #99 begins shift')
+        tracker.add_line('[1518-11-02 00:40] falls asleep')
+        tracker.add_line('[1518-11-02 00:50] wakes up')
+        tracker.add_line('[1518-11-03 00:05] Guard #99 begins shift')
+        tracker.add_line('[1518-11-03 00:45] falls asleep')
+        tracker.add_line('[1518-11-03 00:55] wakes up')
+        self.assertEqual(tracker.sleepiest_guard(), 10)
+        self.assertEqual(tracker.sleepiest_minute(99), (45, 2))
+        self.assertEqual(tracker.sleepiest_guard_minute(), (99, 45))
+
+    def test_guard_sleep_tracker__lateness(self):
+        tracker = GuardSleepTracker(lateness=60)
+        tracker.add_line('[1518-11-01 00:05] falls asleep')
+        tracker.add_line('[1518-11-01 00:00] Guard #10 begins shift')
+        tracker.add_line('[1518-11-01 00:25] wakes up')
+        tracker.add_line('[1518-11-02 00:40] falls asleep')
+        tracker.add_line('[1518-11-01 23:58] Guard #99 begins shift')
+        self.assertEqual(tracker.sleepiest_minute(10), (5, 1))
+        tracker.add_line('[1518-11-02 00:50] wakes up')
+        self.assertEqual(tracker.sleepiest_minute(99), (0, 0))
+        tracker.flush()
+        self.assertEqual(tracker.sleepiest_minute(99), (40, 1))
+
+    def test_reorder_buffer(self):
+        buffer = ReorderBuffer(10)
+        self.assertEqual(buffer.push('[1518-11-01 00:05] falls asleep'), [])
+        self.assertEqual(buffer.push('[1518-11-01 00:00] Guard #10 begins shift'), [])
+        self.assertEqual(
+            buffer.push('[1518-11-01 00:25] wakes up'),
+            ['[1518-11-01 00:00] Guard #10 begins shift', '[1518-11-01 00:05] falls asleep'])
+        self.assertEqual(buffer.flush(), ['[1518-11-01 00:25] wakes up'])
+
+    def test_reorder_buffer__too_late(self):
+        buffer = ReorderBuffer(10)
+        self.assertEqual(buffer.push('[1518-11-01 01:40] falls asleep'), [])
+        self.assertEqual(
+            buffer.push('[1518-11-01 03:20] wakes up'),
+            ['[1518-11-01 01:40] falls asleep'])
+        self.assertEqual(buffer.push('[1518-11-01 00:50] Guard #10 begins shift'), [])
+        self.assertEqual(buffer.dropped, 1)
+        self.assertEqual(buffer.flush(), ['[1518-11-01 03:20] wakes up'])
+
+    def test_parse_stream(self):
+        self.assertEqual(
+            list(parse_stream([
+                '[1518-11-01 00:05] falls asleep',
+                '[1518-11-01 00:00] Guard #10 begins shift',
+                '[1518-11-01 00:25] wakes up',
+                '[1518-11-02 00:40] falls asleep',
+                '[1518-11-01 23:58] Guard #99 begins shift',
+                '[1518-11-02 00:50] wakes up'
+            ], lateness=45)),
+            [
+                OnDuty(datetime.datetime(1518, 11, 1, 0, 0), 10),
+                Sleep(datetime.datetime(1518, 11, 1, 0, 5), 10),
+                Wake(datetime.datetime(1518, 11, 1, 0, 25), 10),
+                OnDuty(datetime.datetime(1518, 11, 1, 23, 58), 99),
+                Sleep(datetime.datetime(1518, 11, 2, 0, 40), 99),
+                Wake(datetime.datetime(1518, 11, 2, 0, 50), 99)
+            ]
+        )
+
+    def test_guard_sleep_tracker__windows(self):
+        tracker = GuardSleepTracker()
+        for window in [
+            Window(10, 5, 25),
+            Window(10, 30, 55),
+            Window(99, 40, 50),
+            Window(10, 24, 29),
+            Window(99, 36, 46),
+            Window(99, 45, 55)
+        ]:
+            tracker.add_window(window)
+        self.assertEqual(tracker.sleepiest_guard(), 10)
+        self.assertEqual(tracker.sleepiest_minute(10), (24, 2))
+        self.assertEqual(tracker.sleepiest_guard_minute(), (99, 45))
+
     def test_process(self):
         self.assertEqual(
             process([
@@ -319,3 +796,40 @@ class Test042(unittest.TestCase):
             ]),
             4455
         )
+
+    def test_shard_bounds(self):
+        self.assertEqual(
+            shard_bounds(array('b', [ON_DUTY, SLEEP, WAKE, ON_DUTY, ON_DUTY, SLEEP, WAKE]), 3),
+            [(0, 3), (3, 7)]
+        )
+
+    def test_minute_histogram_merge(self):
+        histogram = MinuteHistogram([Window(10, 5, 25), Window(99, 40, 50)]).merge(
+            MinuteHistogram([Window(10, 24, 29), Window(7, 0, 1)]))
+        self.assertEqual(histogram.guards, [10, 99, 7])
+        self.assertEqual(histogram.sleepiest_minute(10), (24, 2))
+        self.assertEqual(histogram.sleepiest_minute(7), (0, 1))
+
+    def test_process_parallel(self):
+        self.assertEqual(
+            process_parallel([
+                '[1518-11-01 00:00] Guard #10 begins shift',
+                '[1518-11-01 00:05] falls asleep',
+                '[1518-11-01 00:25] wakes up',
+                '[1518-11-01 00:30] falls asleep',
+                '[1518-11-01 00:55] wakes up',
+                '[1518-11-01 23:58] Guard #99 begins shift',
+                '[1518-11-02 00:40] falls asleep',
+                '[1518-11-02 00:50] wakes up',
+                '[1518-11-03 00:05] Guard #10 begins shift',
+                '[1518-11-03 00:24] falls asleep',
+                '[1518-11-03 00:29] wakes up',
+                '[1518-11-04 00:02] Guard #99 begins shift',
+                '[1518-11-04 00:36] falls asleep',
+                '[1518-11-04 00:46] wakes up',
+                '[1518-11-05 00:03] Guard #99 begins shift',
+                '[1518-11-05 00:45] falls asleep',
+                '[1518-11-05 00:55] wakes up'
+            ], max_workers=2, shards=3),
+            4455
+        )
@@ -1,54 +1,123 @@
-import fileinput
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import io
+import os
+import sys
+from typing import BinaryIO, Tuple
 import unittest
 
 
-def process(polymer: str) -> int:
-    def get_next_idx(curr_idx: int) -> int:
-        next_idx = curr_idx + 1
-        while next_idx < len(bitmap) and not bitmap[next_idx]:
-            next_idx += 1
-
-        if next_idx == len(bitmap):
-            return None
+def react_units(units: bytes, stack: bytearray = None) -> bytearray:
+    if stack is None:
+        stack = bytearray()
+    for unit in units:
+        # opposite polarities of an ASCII letter differ only in the 0x20 case bit; other pairs
+        # such as '@' and '`' differ the same way but never react
+        if stack and stack[-1] ^ unit == 0x20 and 0x61 <= unit | 0x20 <= 0x7a:
+            stack.pop()
         else:
-            return next_idx
+            stack.append(unit)
+    return stack
 
-    def get_len() -> int:
-        return len([x for x in bitmap if x])
 
-    bitmap = [True] * len(polymer)
+def react_stream(stream: BinaryIO, chunk_size: int = 1 << 16) -> bytearray:
+    stack = bytearray()
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        end = chunk.find(b'\n')
+        react_units(chunk[:end if end >= 0 else None].translate(None, b' \t\r'), stack)
+        if end >= 0:
+            break
+    return stack
 
-    change_made = True
-    while change_made and get_len() > 0:
-        change_made = False
-        curr_idx = get_next_idx(-1)
-        next_idx = get_next_idx(curr_idx)
-        while next_idx is not None:
-            curr_unit = polymer[curr_idx]
-            next_unit = polymer[next_idx]
-            if curr_unit != next_unit and curr_unit.upper() == next_unit.upper():
-                bitmap[curr_idx] = False
-                bitmap[next_idx] = False
 
-                change_made = True
+def merge_reduced(left: bytearray, right: bytes) -> bytearray:
+    # both sides are already fully reacted, so only units meeting at the boundary can react
+    matched = 0
+    while (matched < len(left) and matched < len(right) and
+           left[-1 - matched] ^ right[matched] == 0x20 and
+           0x61 <= right[matched] | 0x20 <= 0x7a):
+        matched += 1
+    del left[len(left) - matched:]
+    left += right[matched:]
+    return left
 
-                break
 
-            curr_idx = next_idx
-            next_idx = get_next_idx(curr_idx)
+def react_parallel(units: bytes, chunks: int = None, max_workers: int = None) -> bytearray:
+    if chunks is None:
+        chunks = os.cpu_count() or 1
+    size = max(-(-len(units) // chunks), 1)
 
-    return get_len()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        parts = executor.map(react_units, [units[i:i + size] for i in range(0, len(units), size)])
+        return functools.reduce(merge_reduced, parts, bytearray())
 
 
-if __name__ == '__main__':
-    lines = []
-    for line in fileinput.input():
-        lines += [line.strip()]
+def react(polymer: str) -> Tuple[int, str]:
+    stack = react_units(polymer.encode('ascii'))
+    return len(stack), stack.decode('ascii')
+
 
-    print(process(lines[0]))
+def process(polymer: str, chunks: int = 1) -> int:
+    if chunks > 1:
+        return len(react_parallel(polymer.encode('ascii'), chunks))
+    return react(polymer)[0]
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else '-'
+    with (sys.stdin.buffer if path == '-' else open(path, 'rb')) as stream:
+        print(len(react_stream(stream)))
 
 
 class Test051(unittest.TestCase):
+    def test_react_units(self):
+        self.assertEqual(
+            react_units(b'dabAcCaCBAcCcaDA'),
+            bytearray(b'dabCBAcaDA')
+        )
+
+    def test_react_units__resume(self):
+        self.assertEqual(
+            react_units(b'aDA', bytearray(b'dabCBAc')),
+            bytearray(b'dabCBAcaDA')
+        )
+
+    def test_react_units__non_letters(self):
+        self.assertEqual(
+            react_units(b'@`[{1\x11aA'),
+            bytearray(b'@`[{1\x11')
+        )
+
+    def test_react_stream(self):
+        self.assertEqual(
+            react_stream(io.BytesIO(b'dabAcCaCBAcCcaDA\r\n'), chunk_size=3),
+            bytearray(b'dabCBAcaDA')
+        )
+
+    def test_merge_reduced(self):
+        self.assertEqual(
+            merge_reduced(bytearray(b'dabAc'), b'CaCBAcaDA'),
+            bytearray(b'dabCBAcaDA')
+        )
+
+    def test_merge_reduced__non_letters(self):
+        self.assertEqual(
+            merge_reduced(bytearray(b'a@'), b'`A'),
+            bytearray(b'a@`A')
+        )
+
+    def test_react_parallel(self):
+        self.assertEqual(
+            react_parallel(b'dabAcCaCBAcCcaDA', chunks=5, max_workers=2),
+            bytearray(b'dabCBAcaDA')
+        )
+
+    def test_react(self):
+        self.assertEqual(
+            react('dabAcCaCBAcCcaDA'),
+            (10, 'dabCBAcaDA')
+        )
+
     def test_process_1(self):
         self.assertEqual(
             process('aA'),
@@ -78,3 +147,9 @@ class Test051(unittest.TestCase):
             process('dabAcCaCBAcCcaDA'),
             10
         )
+
+    def test_process__chunked(self):
+        self.assertEqual(
+            process('dabAcCaCBAcCcaDA', chunks=3),
+            10
+        )
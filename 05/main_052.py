@@ -1,78 +1,161 @@
-from concurrent.futures import ProcessPoolExecutor, as_completed
-import fileinput
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import io
+import itertools
+from multiprocessing import shared_memory
+import os
+import sys
+from typing import BinaryIO, Callable, List, Tuple, Union
 import unittest
 
+BACKENDS = ('process', 'thread', 'serial')
 
-def process_one(polymer: str, bitmap: List[bool] = None) -> int:
-    def get_next_idx(curr_idx: int) -> int:
-        next_idx = curr_idx + 1
-        while next_idx < len(bitmap) and not bitmap[next_idx]:
-            next_idx += 1
 
-        if next_idx == len(bitmap):
-            return None
+def react_units(units: bytes, stack: bytearray = None) -> bytearray:
+    if stack is None:
+        stack = bytearray()
+    for unit in units:
+        # opposite polarities of an ASCII letter differ only in the 0x20 case bit; other pairs
+        # such as '@' and '`' differ the same way but never react
+        if stack and stack[-1] ^ unit == 0x20 and 0x61 <= unit | 0x20 <= 0x7a:
+            stack.pop()
         else:
-            return next_idx
+            stack.append(unit)
+    return stack
 
-    def get_len() -> int:
-        return len([x for x in bitmap if x])
 
-    if bitmap is None:
-        bitmap = [True] * len(polymer)
+def react_stream(stream: BinaryIO, chunk_size: int = 1 << 16) -> bytearray:
+    stack = bytearray()
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        end = chunk.find(b'\n')
+        react_units(chunk[:end if end >= 0 else None].translate(None, b' \t\r'), stack)
+        if end >= 0:
+            break
+    return stack
 
-    change_made = True
-    while change_made and get_len() > 0:
-        change_made = False
-        curr_idx = get_next_idx(-1)
-        next_idx = get_next_idx(curr_idx)
-        while next_idx is not None:
-            curr_unit = polymer[curr_idx]
-            next_unit = polymer[next_idx]
-            if curr_unit != next_unit and curr_unit.upper() == next_unit.upper():
-                bitmap[curr_idx] = False
-                bitmap[next_idx] = False
 
-                change_made = True
+def react(polymer: str) -> Tuple[int, str]:
+    stack = react_units(polymer.encode('ascii'))
+    return len(stack), stack.decode('ascii')
 
-                break
 
-            curr_idx = next_idx
-            next_idx = get_next_idx(curr_idx)
+def process_one(polymer: Union[str, bytes], bitmap: bytes = None) -> int:
+    units = polymer.encode('ascii') if isinstance(polymer, str) else polymer
+    if bitmap is not None:
+        units = itertools.compress(units, bitmap)
+    return len(react_units(units))
 
-    return get_len()
 
+def process_one_remove(polymer: Union[str, bytes], char: str) -> int:
+    units = polymer.encode('ascii') if isinstance(polymer, str) else polymer
+    code = ord(char[0].lower())
+    bitmap = bytearray(unit | 0x20 != code for unit in units)
+    return process_one(units, bitmap)
 
-def process_one_remove(polymer: str, char: str) -> Tuple[int, str]:
-    char = char[0].lower()
-    bitmap = [x.lower() != char for x in polymer]
-    return process_one(polymer, bitmap), char
 
+def process_chunk_remove(polymer: Union[str, bytes], chars: str) -> List[Tuple[str, int]]:
+    return [(char, process_one_remove(polymer, char)) for char in chars]
 
-def process(polymer: str) -> int:
-    chars = set([x.lower() for x in polymer])
-    min_length = len(polymer) + 1
 
-    with ProcessPoolExecutor(max_workers=4) as executor:
-        futures = [executor.submit(process_one_remove, polymer, char) for char in chars]
+def process_chunk_remove_shared(name: str, size: int, chars: str) -> List[Tuple[str, int]]:
+    shm = shared_memory.SharedMemory(name=name)
+    units = shm.buf[:size]
+    try:
+        return process_chunk_remove(units, chars)
+    finally:
+        units.release()
+        shm.close()
 
-        for future in as_completed(futures):
-            length, char = future.result()
-            print('{}: {}'.format(char, length))
+
+def process(polymer: Union[str, bytes],
+            prereact: bool = True,
+            max_workers: int = None,
+            backend: str = 'process',
+            chunk_size: int = 1,
+            on_result: Callable[[str, int], None] = None) -> int:
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend: {}'.format(backend))
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive: {}'.format(chunk_size))
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    units = polymer.encode('ascii') if isinstance(polymer, str) else polymer
+    if prereact:
+        # removing a unit type after reduction leaves the same final length, so every trial can
+        # start from the already-collapsed polymer
+        units = react_units(units)
+
+    if not units:
+        return 0
+
+    chars = sorted(set(units.lower().decode('ascii')))
+    chunks = [''.join(chars[i:i + chunk_size]) for i in range(0, len(chars), chunk_size)]
+    min_length = len(units) + 1
+
+    def collect(results: List[Tuple[str, int]]):
+        nonlocal min_length
+        for char, length in results:
+            if on_result is not None:
+                on_result(char, length)
             min_length = min(min_length, length)
 
+    if backend == 'serial':
+        for chunk in chunks:
+            collect(process_chunk_remove(units, chunk))
+    elif backend == 'thread':
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(process_chunk_remove, units, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                collect(future.result())
+    else:
+        # workers attach to the polymer by name instead of receiving a pickled copy per task
+        shm = shared_memory.SharedMemory(create=True, size=max(len(units), 1))
+        try:
+            shm.buf[:len(units)] = units
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(process_chunk_remove_shared, shm.name, len(units), chunk)
+                    for chunk in chunks
+                ]
+                for future in as_completed(futures):
+                    collect(future.result())
+        finally:
+            shm.close()
+            shm.unlink()
+
     return min_length
 
 
 if __name__ == '__main__':
-    lines = []
-    for line in fileinput.input():
-        lines += [line.strip()]
+    def print_result(char: str, length: int):
+        print('{}: {}'.format(char, length))
+
+    path = sys.argv[1] if len(sys.argv) > 1 else '-'
+    with (sys.stdin.buffer if path == '-' else open(path, 'rb')) as stream:
+        reduced = react_stream(stream)
 
-    print(process(lines[0]))
+    print(process(reduced, prereact=False, on_result=print_result))
 
 
 class Test052(unittest.TestCase):
+    def test_react_stream(self):
+        self.assertEqual(
+            react_stream(io.BytesIO(b'dabAcCaCBAcCcaDA\r\n'), chunk_size=3),
+            bytearray(b'dabCBAcaDA')
+        )
+
+    def test_react_units__non_letters(self):
+        self.assertEqual(
+            react_units(b'@`[{1\x11aA'),
+            bytearray(b'@`[{1\x11')
+        )
+
+    def test_react(self):
+        self.assertEqual(
+            react('dabAcCaCBAcCcaDA'),
+            (10, 'dabCBAcaDA')
+        )
+
     def test_process_one_1(self):
         self.assertEqual(
             process_one('aA'),
@@ -127,8 +210,51 @@ class Test052(unittest.TestCase):
             6
         )
 
+    def test_process_one_remove__bytes(self):
+        self.assertEqual(
+            process_one_remove(b'dabAcCaCBAcCcaDA', 'C'),
+            4
+        )
+
     def test_process(self):
         self.assertEqual(
             process('dabAcCaCBAcCcaDA'),
             4
         )
+
+    def test_process__raw(self):
+        self.assertEqual(
+            process('dabAcCaCBAcCcaDA', prereact=False),
+            4
+        )
+
+    def test_process__reacts_away(self):
+        self.assertEqual(process('aA', backend='serial'), 0)
+        self.assertEqual(process('aA', max_workers=1), 0)
+
+    def test_process__serial(self):
+        results = []
+        self.assertEqual(
+            process('dabAcCaCBAcCcaDA', backend='serial', on_result=lambda *x: results.append(x)),
+            4
+        )
+        self.assertEqual(
+            results,
+            [('a', 6), ('b', 8), ('c', 4), ('d', 6)]
+        )
+
+    def test_process__thread_chunked(self):
+        self.assertEqual(
+            process('dabAcCaCBAcCcaDA', max_workers=2, backend='thread', chunk_size=3),
+            4
+        )
+
+    def test_process__bad_chunk_size(self):
+        with self.assertRaises(ValueError):
+            process('dabAcCaCBAcCcaDA', chunk_size=0)
+
+    def test_process__chunked(self):
+        self.assertEqual(
+            process('dabAcCaCBAcCcaDA', max_workers=2, chunk_size=2),
+            4
+        )
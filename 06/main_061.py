@@ -0,0 +1,148 @@
+from array import array
+from collections import Counter
+import fileinput
+import re
+from typing import List, Type, TypeVar
+import unittest
+
+T = TypeVar('T', bound='Coord')
+
+TIE = -1
+UNCLAIMED = -2
+
+
+class Coord(object):
+    __slots__ = ('x', 'y')
+
+    PARSER = re.compile(r'([0-9]+), ([0-9]+)')
+
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+
+    @classmethod
+    def from_line(cls: Type[T], line: str) -> T:
+        for matches in cls.PARSER.findall(line):
+            return Coord(*[int(x) for x in matches])
+
+    def __repr__(self):
+        return 'Coord({}, {})'.format(self.x, self.y)
+
+    def __eq__(self, other):
+        return (self.x == other.x and
+                self.y == other.y)
+
+
+class Grid(object):
+    def __init__(self, left: int, top: int, width: int, height: int, owners: array):
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.owners = owners
+
+    def owner(self, x: int, y: int) -> int:
+        return self.owners[(y - self.top) * self.width + (x - self.left)]
+
+    def border_owners(self) -> set:
+        width = self.width
+        return (set(self.owners[:width]) |
+                set(self.owners[-width:]) |
+                set(self.owners[::width]) |
+                set(self.owners[width - 1::width]))
+
+    def areas(self) -> Counter:
+        return Counter(self.owners)
+
+
+def parse(lines: List[str]) -> List[Coord]:
+    return [Coord.from_line(x) for x in lines]
+
+
+def closest(coords: List[Coord]) -> Grid:
+    left = min(coord.x for coord in coords)
+    top = min(coord.y for coord in coords)
+    width = max(coord.x for coord in coords) - left + 1
+    height = max(coord.y for coord in coords) - top + 1
+
+    owners = array('i', [UNCLAIMED]) * (width * height)
+    frontier = []
+    for idx, coord in enumerate(coords):
+        cell = (coord.y - top) * width + (coord.x - left)
+        if owners[cell] == UNCLAIMED:
+            owners[cell] = idx
+            frontier.append(cell)
+        else:
+            owners[cell] = TIE
+
+    # multi-source BFS, one Manhattan distance per round: a cell belongs to a single coordinate
+    # only if every neighbour it was reached from in the same round belongs to that coordinate
+    while frontier:
+        reached = {}
+        for cell in frontier:
+            owner = owners[cell]
+            x = cell % width
+            for neighbour, inside in ((cell - width, cell >= width),
+                                      (cell + width, cell < len(owners) - width),
+                                      (cell - 1, x > 0),
+                                      (cell + 1, x < width - 1)):
+                if not inside or owners[neighbour] != UNCLAIMED:
+                    continue
+                prev = reached.get(neighbour)
+                reached[neighbour] = owner if prev is None or prev == owner else TIE
+        for cell, owner in reached.items():
+            owners[cell] = owner
+        frontier = list(reached)
+
+    return Grid(left, top, width, height, owners)
+
+
+def process(coords: List[Coord]) -> int:
+    grid = closest(coords)
+    # areas touching the bounding box keep growing outside it forever
+    infinite = grid.border_owners() | {TIE}
+    return max((area for owner, area in grid.areas().items() if owner not in infinite), default=0)
+
+
+if __name__ == '__main__':
+    lines = []
+    for line in fileinput.input():
+        lines += [line.strip()]
+    print(process(parse(lines)))
+
+
+class Test061(unittest.TestCase):
+    COORDS = [
+        Coord(1, 1),
+        Coord(1, 6),
+        Coord(8, 3),
+        Coord(3, 4),
+        Coord(5, 5),
+        Coord(8, 9)
+    ]
+
+    def test_parse(self):
+        self.assertEqual(
+            parse(['1, 1', '8, 9']),
+            [Coord(1, 1), Coord(8, 9)])
+
+    def test_closest(self):
+        grid = closest(self.COORDS)
+        self.assertEqual(grid.owner(1, 1), 0)
+        self.assertEqual(grid.owner(2, 3), 3)
+        self.assertEqual(grid.owner(5, 1), TIE)
+        self.assertEqual(grid.owner(2, 5), TIE)
+        self.assertEqual(grid.owner(6, 5), 4)
+        self.assertEqual(grid.areas()[3], 9)
+        self.assertEqual(grid.areas()[4], 17)
+
+    def test_closest__duplicate(self):
+        grid = closest([Coord(0, 0), Coord(0, 0), Coord(4, 0)])
+        self.assertEqual(grid.owner(0, 0), TIE)
+        self.assertEqual(grid.owner(1, 0), TIE)
+        self.assertEqual(grid.owner(3, 0), 2)
+
+    def test_process(self):
+        self.assertEqual(
+            process(self.COORDS),
+            17)